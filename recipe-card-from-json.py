@@ -4,6 +4,12 @@ Generate a multi-page recipe PDF from a JSON file.
 
 USAGE:
     python generate_recipe_from_json.py --json recipe.json --out recipe.pdf
+    python generate_recipe_from_json.py --json a.json --output a.pdf --json b.json --output b.pdf
+
+ENVIRONMENT:
+    RECIPE_DEBUG=1    keep ReportLab's attribute shape-checking on during build
+                      and isolate every banner/footer draw (see FAST_DRAW)
+    RECIPE_TRUSTED=1  skip component-level JSON validation (trusted input)
 
 JSON shape (abridged):
 {
@@ -22,20 +28,33 @@ JSON shape (abridged):
 """
 
 import argparse
-import json
+import functools
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+# Prefer orjson when available: it parses bytes directly and is much faster
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+_loads = _json.loads
 
 # ReportLab
+from reportlab import rl_config
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.styles import ParagraphStyle, StyleSheet1, getSampleStyleSheet
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfgen.canvas import Canvas
 from reportlab.platypus import (
     BaseDocTemplate,
     Flowable,
     Frame,
+    LongTable,
     PageBreak,
     PageTemplate,
     Paragraph,
@@ -44,17 +63,54 @@ from reportlab.platypus import (
     TableStyle,
 )
 
+# Only the PDF core fonts (Helvetica, Helvetica-Bold) are used, so there is
+# nothing to discover on disk; don't let ReportLab scan font directories.
+rl_config.warnOnMissingFontGlyphs = 0
+rl_config.T1SearchPath = []
+rl_config.TTFSearchPath = []
+
+# Skip redundant saveState/restoreState pairs in our own drawing code; set
+# RECIPE_DEBUG to keep every draw strictly isolated.
+FAST_DRAW = not os.environ.get("RECIPE_DEBUG")
+
+# Palette, parsed once at import
+_NAVY = colors.HexColor("#112c4c")
+_STEELBLUE = colors.HexColor("#4682B4")
+
 # -----------------------------------------------------------------------------
 # Load & validate
 # -----------------------------------------------------------------------------
 
-def load_recipe_json(path: Path) -> Dict[str, Any]:
-    """Load and minimally validate the recipe JSON."""
+def load_recipe_json(path: Path, *, validate: bool = True) -> Dict[str, Any]:
+    """
+    Load and minimally validate the recipe JSON.
+
+    With validate=False only the top-level shape is checked; use it for
+    trusted, developer-authored files. Results are memoized on (path, mtime,
+    size), so re-rendering an unchanged file skips parsing and validation.
+    Treat the returned dict as read-only.
+    """
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        raise SystemExit(f"ERROR: JSON file not found: {path}")
+    return _load_recipe_json_cached(str(path), st.st_mtime_ns, st.st_size, validate)
+
+
+@functools.lru_cache(maxsize=32)
+def _load_recipe_json_cached(
+    path: str, mtime_ns: int, size: int, validate: bool
+) -> Dict[str, Any]:
+    # mtime_ns and size only take part in the cache key
+    return _read_recipe_json(Path(path), validate)
+
+
+def _read_recipe_json(path: Path, validate: bool) -> Dict[str, Any]:
     try:
-        data = json.loads(path.read_text(encoding="utf-8"))
+        data = _loads(path.read_bytes())
     except FileNotFoundError:
         raise SystemExit(f"ERROR: JSON file not found: {path}")
-    except json.JSONDecodeError as e:
+    except ValueError as e:  # json/orjson JSONDecodeError, bad UTF-8
         raise SystemExit(f"ERROR: Failed to parse JSON: {e}")
 
     if not isinstance(data, dict):
@@ -68,6 +124,10 @@ def load_recipe_json(path: Path) -> Dict[str, Any]:
     if "version" not in data:
         print("WARN: Missing 'version'; footer will be blank.")
 
+    # Trusted input: skip the per-component checks
+    if not validate:
+        return data
+
     # Component-level checks
     for idx, comp in enumerate(data["components"], start=1):
         if not isinstance(comp, dict):
@@ -77,23 +137,23 @@ def load_recipe_json(path: Path) -> Dict[str, Any]:
 
         if "ingredients" in comp:
             ing = comp["ingredients"]
-            if not isinstance(ing, list) or any(
-                not isinstance(row, list) or len(row) != 2 for row in ing
+            if not isinstance(ing, list) or not all(
+                isinstance(row, list) and len(row) == 2 for row in ing
             ):
                 raise SystemExit(
                     f"ERROR: components[{idx}].ingredients must be a list of [name, amount] pairs."
                 )
         if "equipment" in comp:
             eq = comp["equipment"]
-            if not isinstance(eq, list) or any(
-                not isinstance(row, list) or len(row) != 1 for row in eq
+            if not isinstance(eq, list) or not all(
+                isinstance(row, list) and len(row) == 1 for row in eq
             ):
                 raise SystemExit(
                     f"ERROR: components[{idx}].equipment must be a list of single-item rows, e.g. [[\"Quarter-sheet pan\"], ...]."
                 )
         if "instructions" in comp:
             ins = comp["instructions"]
-            if not isinstance(ins, list) or any(not isinstance(s, str) for s in ins):
+            if not isinstance(ins, list) or not all(isinstance(s, str) for s in ins):
                 raise SystemExit(
                     f"ERROR: components[{idx}].instructions must be a list of strings."
                 )
@@ -105,6 +165,15 @@ def load_recipe_json(path: Path) -> Dict[str, Any]:
 # Page furniture: two rounded rules around the centered component name
 # -----------------------------------------------------------------------------
 
+@functools.lru_cache(maxsize=32)
+def _font_metrics(font_name: str, font_size: float) -> Tuple[float, float]:
+    """(text height, descent) in points, from the font's ascent/descent."""
+    face = pdfmetrics.getFont(font_name).face
+    ascent = face.ascent * font_size / 1000.0
+    descent = abs(face.descent) * font_size / 1000.0
+    return ascent + descent, descent
+
+
 class ComponentBanner(Flowable):
     """
     Component header with two rounded rules (top & bottom), centered horizontally,
@@ -116,12 +185,33 @@ class ComponentBanner(Flowable):
       - Vertical positions use font ascent/descent for optical centering
     """
 
+    # Geometry read on every wrap/draw lives in slots rather than __dict__
+    # (Flowable itself still carries a __dict__ for its own bookkeeping).
+    __slots__ = (
+        "text",
+        "container_width",
+        "line_thickness",
+        "color",
+        "font_name",
+        "font_size",
+        "gap_above",
+        "padding_top",
+        "padding_bottom",
+        "gap_below",
+        "text_height",
+        "text_descent",
+        "band_height",
+        "width",
+        "height",
+        "_text_w",
+    )
+
     def __init__(
         self,
         text: str,
         container_width: float,
         line_thickness: float = 2.83465,  # ~1 mm
-        color: colors.Color = colors.HexColor("#112c4c"),
+        color: colors.Color = _NAVY,
         font_name: str = "Helvetica-Bold",
         font_size: float = 16.0,
         gap_above: float = 16.0,
@@ -143,11 +233,8 @@ class ComponentBanner(Flowable):
         self.gap_below = float(gap_below)
 
         # Font metrics for vertical placement
-        face = pdfmetrics.getFont(self.font_name).face
-        ascent = face.ascent * self.font_size / 1000.0
-        descent = abs(face.descent) * self.font_size / 1000.0
-        self.text_height = ascent + descent
-        self.text_descent = descent
+        self.text_height, self.text_descent = _font_metrics(self.font_name, self.font_size)
+        self._text_w = pdfmetrics.stringWidth(self.text, self.font_name, self.font_size)
 
         # Band between rules (text + paddings)
         self.band_height = self.padding_top + self.text_height + self.padding_bottom
@@ -161,7 +248,10 @@ class ComponentBanner(Flowable):
 
     def draw(self) -> None:
         c: Canvas = self.canv
-        c.saveState()
+        # Flowable.drawOn already brackets draw() with saveState/restoreState;
+        # the inner pair is only kept for strict isolation (FAST_DRAW off).
+        if not FAST_DRAW:
+            c.saveState()
         try:
             c.setStrokeColor(self.color)
             c.setFillColor(self.color)
@@ -174,18 +264,24 @@ class ComponentBanner(Flowable):
             # Vertical positions for rules and baseline
             y_bottom = self.gap_above
             y_top = self.gap_above + self.band_height
-            c.line(x0, y_bottom, x1, y_bottom)
-            c.line(x0, y_top, x1, y_top)
+            # Both rules in one path: a single stroke operator
+            p = c.beginPath()
+            p.moveTo(x0, y_bottom)
+            p.lineTo(x1, y_bottom)
+            p.moveTo(x0, y_top)
+            p.lineTo(x1, y_top)
+            c.drawPath(p, stroke=1, fill=0)
 
             # Centered text baseline inside the band
-            text_w = pdfmetrics.stringWidth(self.text, self.font_name, self.font_size)
+            text_w = self._text_w
             tx = (self.container_width - text_w) / 2.0
             baseline_y = self.gap_above + self.padding_bottom + self.text_descent
 
             c.setFont(self.font_name, self.font_size)
             c.drawString(tx, baseline_y, self.text)
         finally:
-            c.restoreState()
+            if not FAST_DRAW:
+                c.restoreState()
 
 
 def make_footer(version_text: str):
@@ -193,7 +289,8 @@ def make_footer(version_text: str):
     version_text = version_text or ""
 
     def _footer(canvas: Canvas, doc: BaseDocTemplate) -> None:
-        canvas.saveState()
+        if not FAST_DRAW:
+            canvas.saveState()
         try:
             margin = 36  # 0.5 in
             font = "Helvetica"
@@ -205,7 +302,11 @@ def make_footer(version_text: str):
             y = margin / 2.0
             canvas.drawString(x, y, version_text)
         finally:
-            canvas.restoreState()
+            if FAST_DRAW:
+                # Only the fill colour could leak into the page; reset it.
+                canvas.setFillColor(colors.black)
+            else:
+                canvas.restoreState()
 
     return _footer
 
@@ -214,15 +315,78 @@ def make_footer(version_text: str):
 # Render
 # -----------------------------------------------------------------------------
 
-def build_pdf(json_path: str, out_path: str) -> None:
-    data = load_recipe_json(Path(json_path))
+_STYLES: Optional[StyleSheet1] = None
+
+
+def _get_styles() -> StyleSheet1:
+    """Sample stylesheet plus our custom styles, built once and shared."""
+    global _STYLES
+    if _STYLES is not None:
+        return _STYLES
+
+    styles = getSampleStyleSheet()
+    if "MainTitle" not in styles:
+        styles.add(
+            ParagraphStyle(
+                name="MainTitle",
+                fontName="Helvetica-Bold",
+                fontSize=24,
+                textColor=_NAVY,
+                alignment=1,  # center
+                spaceAfter=12,
+            )
+        )
+    if "InstructionHeader" not in styles:
+        styles.add(
+            ParagraphStyle(
+                name="InstructionHeader",
+                fontName="Helvetica-Bold",
+                fontSize=12,
+                textColor=_STEELBLUE,
+                spaceBefore=12,
+                spaceAfter=6,
+            )
+        )
+    if "InstructionBlock" not in styles:
+        styles.add(
+            ParagraphStyle(
+                name="InstructionBlock",
+                parent=styles["Normal"],
+                fontName="Helvetica",
+                fontSize=11,
+                leading=14,
+                spaceBefore=2,
+                spaceAfter=6,
+            )
+        )
+
+    _STYLES = styles
+    return _STYLES
+
+
+# Shared by the equipment and ingredients tables
+_HEADERED_TABLE_STYLE = TableStyle(
+    [
+        ("BACKGROUND", (0, 0), (-1, 0), _STEELBLUE),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("BOTTOMPADDING", (0, 0), (-1, 0), 6),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+    ]
+)
+
+
+def render_pdf(json_path: str, dest: BinaryIO, *, validate: bool = True) -> None:
+    """Render one recipe into the writable binary file *dest*."""
+    data = load_recipe_json(Path(json_path), validate=validate)
 
     title: str = data.get("title", "Recipe")
     version: str = data.get("version", "")
     components: List[Dict[str, Any]] = data["components"]
 
     doc = BaseDocTemplate(
-        out_path,
+        dest,
         pagesize=letter,
         leftMargin=72,
         rightMargin=72,
@@ -245,61 +409,29 @@ def build_pdf(json_path: str, out_path: str) -> None:
     tpl = PageTemplate(id="content", frames=[frame], onPage=footer)
     doc.addPageTemplates(tpl)
 
-    styles = getSampleStyleSheet()
-    styles.add(
-        ParagraphStyle(
-            name="MainTitle",
-            fontName="Helvetica-Bold",
-            fontSize=24,
-            textColor=colors.HexColor("#112c4c"),
-            alignment=1,  # center
-            spaceAfter=12,
-        )
-    )
-    styles.add(
-        ParagraphStyle(
-            name="InstructionHeader",
-            fontName="Helvetica-Bold",
-            fontSize=12,
-            textColor=colors.HexColor("#4682B4"),  # steelblue
-            spaceBefore=12,
-            spaceAfter=6,
-        )
-    )
-    styles.add(
-        ParagraphStyle(
-            name="InstructionBlock",
-            parent=styles["Normal"],
-            fontName="Helvetica",
-            fontSize=11,
-            leading=14,
-            spaceBefore=2,
-            spaceAfter=6,
-        )
-    )
+    styles = _get_styles()
 
     def style_headered_table(table: Table) -> None:
-        table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#4682B4")),  # steelblue
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-                    ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("BOTTOMPADDING", (0, 0), (-1, 0), 6),
-                    ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-                ]
-            )
-        )
+        table.setStyle(_HEADERED_TABLE_STYLE)
 
     story: List[Any] = []
 
+    # Same title on each component page (as in original output); the title
+    # never splits, so one parsed Paragraph can be drawn on every page.
+    title_para = Paragraph(title, styles["MainTitle"])
+
+    # Everything below is identical for every component; resolve it once
+    # rather than per loop iteration.
+    instructions_header = Paragraph("Instructions", styles["InstructionHeader"])
+    block_style = styles["InstructionBlock"]
+    eq_col_widths = [doc.width]
+    ing_col_widths = [doc.width * 0.65, doc.width * 0.35]
+
     for idx, comp in enumerate(components):
         if idx > 0:
             story.append(PageBreak())
 
-        # Same title on each component page (as in original output)
-        story.append(Paragraph(title, styles["MainTitle"]))
+        story.append(title_para)
 
         # Component header with TWO rounded rules, centered
         story.append(
@@ -307,7 +439,7 @@ def build_pdf(json_path: str, out_path: str) -> None:
                 text=comp["name"],
                 container_width=doc.width,
                 line_thickness=2.83465,
-                color=colors.HexColor("#112c4c"),
+                color=_NAVY,
                 font_name="Helvetica-Bold",
                 font_size=16,
                 gap_above=16,
@@ -322,7 +454,7 @@ def build_pdf(json_path: str, out_path: str) -> None:
         # Optional equipment (single-column)
         equipment: List[List[str]] = comp.get("equipment", [])
         if equipment:
-            eq_table = Table([["Equipment"]] + equipment, colWidths=[doc.width], hAlign="LEFT")
+            eq_table = LongTable([["Equipment"], *equipment], colWidths=eq_col_widths, hAlign="LEFT")
             style_headered_table(eq_table)
             story.append(eq_table)
             story.append(Spacer(1, 12))
@@ -330,9 +462,9 @@ def build_pdf(json_path: str, out_path: str) -> None:
         # Ingredients table
         ingredients: List[List[str]] = comp.get("ingredients", [])
         if ingredients:
-            ing_table = Table(
-                [["Ingredient", "Amount"]] + ingredients,
-                colWidths=[doc.width * 0.65, doc.width * 0.35],
+            ing_table = LongTable(
+                [["Ingredient", "Amount"], *ingredients],
+                colWidths=ing_col_widths,
                 hAlign="LEFT",
             )
             style_headered_table(ing_table)
@@ -341,11 +473,56 @@ def build_pdf(json_path: str, out_path: str) -> None:
         # Instructions
         instructions: List[str] = comp.get("instructions", [])
         if instructions:
-            story.append(Paragraph("Instructions", styles["InstructionHeader"]))
-            for step in instructions:
-                story.append(Paragraph(step, styles["InstructionBlock"]))
+            story.append(instructions_header)
+            # Steps are plain text; escape once so stray &, < and > never hit
+            # the paraparser as markup. Keep one Paragraph per step: joining
+            # them with <br/><br/> would space steps a full 14pt line apart
+            # instead of 6pt and push every bundled recipe onto an extra page.
+            story.extend([Paragraph(escape(step), block_style) for step in instructions])
+
+    # Attribute shape-checking is a debugging aid; keep it only on request.
+    prev_shape_checking = rl_config.shapeChecking
+    if not os.environ.get("RECIPE_DEBUG"):
+        rl_config.shapeChecking = 0
+    try:
+        doc.build(story)
+    finally:
+        rl_config.shapeChecking = prev_shape_checking
+
+
+def _write_bytes(out_path: str, data: bytes) -> None:
+    """Write *data* with raw os.write calls (normally just one), no buffering."""
+    with open(out_path, "wb", buffering=0) as f:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(f.fileno(), view):]
+
+
+def build_pdf(json_path: str, out_path: str, *, validate: bool = True) -> None:
+    """Render one recipe to memory, then write *out_path* in one shot."""
+    buf = io.BytesIO()
+    render_pdf(json_path, buf, validate=validate)
+    _write_bytes(out_path, buf.getvalue())
 
-    doc.build(story)
+
+def build_pdfs(pairs: Sequence[Tuple[str, str]], *, validate: bool = True) -> None:
+    """
+    Render several (json_path, out_path) recipes, then write them together.
+
+    Rendering stays sequential (ReportLab is single-threaded); each PDF goes
+    to memory first, and only the file writes are handed to a thread pool so
+    the I/O for the whole batch overlaps.
+    """
+    out_paths: List[str] = []
+    payloads: List[bytes] = []
+    for json_path, out_path in pairs:
+        buf = io.BytesIO()
+        render_pdf(json_path, buf, validate=validate)
+        out_paths.append(out_path)
+        payloads.append(buf.getvalue())
+
+    with ThreadPoolExecutor() as pool:
+        list(pool.map(_write_bytes, out_paths, payloads))
 
 
 # -----------------------------------------------------------------------------
@@ -354,14 +531,34 @@ def build_pdf(json_path: str, out_path: str) -> None:
 
 def parse_args(argv: Optional[Sequence[str]] = None):
     ap = argparse.ArgumentParser(description="Render a recipe PDF from JSON.")
-    ap.add_argument("--json", required=True, help="Path to recipe JSON file")
-    ap.add_argument("--output", required=True, help="Output PDF path")
-    return ap.parse_args(argv)
+    ap.add_argument(
+        "--json", required=True, action="append",
+        help="Path to recipe JSON file (repeat for several recipes)",
+    )
+    ap.add_argument(
+        "--output", required=True, action="append",
+        help="Output PDF path (one per --json, in the same order)",
+    )
+    args = ap.parse_args(argv)
+    if len(args.json) != len(args.output):
+        ap.error("each --json needs a matching --output")
+    return args
 
 
 def main(argv: Optional[Sequence[str]] = None) -> None:
     args = parse_args(argv)
-    build_pdf(args.json, args.output)
+    render = functools.partial(build_pdf, validate=not os.environ.get("RECIPE_TRUSTED"))
+    if len(args.json) == 1:
+        render(args.json[0], args.output[0])
+        return
+
+    # Several recipes: one file per task, spread over worker processes. Each
+    # worker imports ReportLab and builds the shared styles once, so hand it
+    # a few recipes at a time when there are enough to go round.
+    workers = min(os.cpu_count() or 1, len(args.json))
+    chunksize = max(1, min(4, len(args.json) // workers))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(render, args.json, args.output, chunksize=chunksize))
 
 
 if __name__ == "__main__":